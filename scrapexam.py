@@ -8,14 +8,19 @@ MSRIT Results Scraper - Selenium (multi-year / multi-branch, nested JSON)
   For each (year, branch) we scrape:
     • Normal students: 001.. (stop after MAX_CONSEC_OOPS continuous OOPS)
     • Diploma students: (year+1, same branch) 401.. (also stop after MAX_CONSEC_OOPS continuous OOPS)
-- User solves CAPTCHA manually on first USN; session is reused where possible.
+- Tracks run in parallel: each worker thread owns one Chrome session and reuses it across tracks.
+- User solves CAPTCHA manually once per browser (prompts are serialized); session is reused where possible.
 - Timeout handling: timeout is NOT treated as OOPS — after retries it will prompt you to re-enter captcha.
 - JSON output: single "students" array (contains both normal and diploma USNs).
 """
 
-import time
 import re
 import json
+import os
+import queue
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 from selenium import webdriver
@@ -23,7 +28,14 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.remote.remote_connection import RemoteConnection
+from selenium.common.exceptions import JavascriptException, TimeoutException
+from urllib3.connection import HTTPConnection
+
+try:
+    import orjson  # optional: faster JSON serialization
+except ImportError:
+    orjson = None
 
 # --- CONFIG ---
 BASE_URL = "https://exam.msrit.edu/"
@@ -38,14 +50,97 @@ ROLL_START = 1
 # Diploma rolls (join 2nd year). Year used = int(normal_year)+1, rolls 401+
 DIP_START = 401
 
+# USN rolls are three digits; normal tracks end where diploma rolls begin
+ROLL_MAX = 999
+
 MAX_CONSEC_OOPS = 5   # stop each track after this many consecutive OOPS
 RETRY_ON_TIMEOUT = 2  # number of times to retry ambiguous/timeout states before prompting captcha
+POLL_INTERVAL = 0.2   # seconds between WebDriverWait polls
+HTTP_BATCH = 8        # USNs submitted together with in-page fetch() before falling back to Selenium
+STREAM_BUFFER_SIZE = 1 << 20  # NDJSON write buffer (bytes)
+STREAM_FLUSH_EVERY = 64       # flush the NDJSON stream every N students (a crash loses at most N-1)
+MAX_WORKERS = len(BRANCHES)  # parallel browsers; each needs one manual CAPTCHA
+WEBDRIVER_POOL_MAXSIZE = 4   # persistent sockets per chromedriver
+# Subresources never needed for scraping (images stay on: the CAPTCHA is an image)
+BLOCKED_URL_PATTERNS = ["*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot"]
 # ----------------
 
+# Compiled once; applied to every result page
+_SEM_RE = re.compile(r"Semester\s*(\d+)", re.IGNORECASE)
+_SGPA_RE = re.compile(r"SGPA[:\s]*([\d.]+)")
+_CGPA_RE = re.compile(r"CGPA[:\s]*([\d.]+)")
+_NUM_RE = re.compile(r"([\d.]+)")
+
+# Selectors (tried in order)
+GO_BUTTON_SELECTORS = (
+    (By.XPATH, "//input[@value='GO' or @value='Go' or @value='go']"),
+    (By.XPATH, "//input[@type='submit']"),
+    (By.XPATH, "//button[contains(., 'GO') or contains(., 'Go') or contains(., 'Submit')]"),
+    (By.ID, "btn7"),
+)
+NAME_SELECTORS = (
+    ("css", "div.stu-data h3"),
+    ("css", "div.stu-data h2"),
+    ("css", "div.stu-data.stu-data2 h2"),
+    ("css", "div.student-header h2"),
+    ("css", "div.student-header h3"),
+    ("xpath", "//h3[normalize-space() and string-length(normalize-space())>2]"),
+)
+CGPA_XPATHS = (
+    "//p[contains(., 'CGPA')]",
+    "//div[contains(., 'CGPA')]",
+    "//td[contains(., 'CGPA')]/following-sibling::td[1]",
+)
+RESULT_TBODY_CSS = "table.uk-table.uk-table-striped.res-table tbody"
+CARD_SELECTORS = (".uk-card.uk-card-default.uk-card-body.cn-card", ".cn-result-card")
+
+_prompts = queue.Queue()          # worker prompts, answered one at a time on the main thread
+_stop = threading.Event()         # set on shutdown so workers stop submitting
+_worker = threading.local()       # per-thread Chrome session
+_drivers = []
+_drivers_lock = threading.Lock()
+_stream_lock = threading.Lock()   # workers share one NDJSON stream
+_stream_unflushed = 0             # students written since the last flush (guarded by _stream_lock)
+
 
 # ---------- Helpers ----------
 def wait(driver, secs=12):
-    return WebDriverWait(driver, secs)
+    # JS probes can race a navigation; treat that like "not yet" and poll again
+    return WebDriverWait(driver, secs, poll_frequency=POLL_INTERVAL,
+                         ignored_exceptions=(JavascriptException,))
+
+
+def prompt_user(message, notice=None):
+    """
+    Ask the user to press ENTER (called from worker threads). Workers never read stdin:
+    the prompt is queued for the main thread (serve_prompts), so prompts from different
+    browsers never interleave, and the worker waits for the answer -- or returns at once
+    when the run is stopping, so Ctrl+C never leaves a thread blocked on a prompt.
+    """
+    if _stop.is_set():
+        return
+    answered = threading.Event()
+    _prompts.put((message, notice, answered))
+    while not answered.wait(POLL_INTERVAL):
+        if _stop.is_set():
+            return
+
+
+def serve_prompts(futures):
+    """
+    Main-thread side of prompt_user(): show queued prompts one at a time until every
+    track has finished. Rings the terminal bell, since scraping stalls until someone answers.
+    """
+    while not all(fut.done() for _, fut in futures):
+        try:
+            message, notice, answered = _prompts.get(timeout=POLL_INTERVAL)
+        except queue.Empty:
+            continue
+        print("\a", end="", flush=True)
+        if notice:
+            print(notice)
+        input(message)
+        answered.set()
 
 
 def set_input_value_js(driver, element, value):
@@ -63,14 +158,236 @@ def set_input_value_js(driver, element, value):
     )
 
 
+# In-page helpers. Every function takes the document to inspect, so the same code serves
+# the live page and HTML fetched with fetch(). Installed once per browser as window.__msrit
+# (install_js_bundle); the per-call scripts below only name the function to run.
+_JS_LIB = r"""
+const msrit = {
+    // OOPS / not-found text, tested in-page instead of pulling page_source over the wire
+    oops(doc) {
+        return /your usn could not be found|could not be found in our result database/i
+            .test(doc.body ? doc.body.textContent : "");
+    },
+
+    // "oops" | "cards" | "table" | ""
+    state(doc, tbodyCss) {
+        if (msrit.oops(doc)) return "oops";
+        if (doc.querySelector(".cn-result-card")) return "cards";
+        if (doc.querySelector("div.student-header p") || doc.querySelector(tbodyCss)) return "table";
+        return "";
+    },
+
+    // Every field of a result page; raw strings, parsing stays in Python (parse_result_view)
+    extract(doc, nameSelectors, cgpaXPaths, tbodyCss) {
+        // Collapse whitespace: on a DOMParser document innerText falls back to raw textContent,
+        // so this keeps names identical between fetched and rendered pages (dedup keys)
+        const text = (el) => (el && el.innerText ? el.innerText.replace(/\s+/g, " ").trim() : "");
+        const all = (kind, sel) => {
+            if (kind === "css") return Array.from(doc.querySelectorAll(sel));
+            const snap = doc.evaluate(sel, doc, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+            const out = [];
+            for (let i = 0; i < snap.snapshotLength; i++) out.push(snap.snapshotItem(i));
+            return out;
+        };
+
+        let name = "";
+        search:
+        for (const [kind, sel] of nameSelectors) {
+            for (const el of all(kind, sel)) {
+                const t = text(el);
+                if (t && !["semester", "result", "exam"].includes(t.toLowerCase())) {
+                    name = t;
+                    break search;
+                }
+            }
+        }
+
+        const cgpaTexts = cgpaXPaths.map((xp) => {
+            const el = all("xpath", xp)[0];
+            return el ? text(el) : null;
+        });
+
+        const caption = doc.querySelector("table.uk-table.uk-table-striped.res-table caption");
+        const rows = [];
+        const tbody = doc.querySelector(tbodyCss);
+        if (tbody) {
+            for (const tr of tbody.querySelectorAll("tr")) {
+                const tds = tr.querySelectorAll("td");
+                if (tds.length >= 5) rows.push([text(tds[0]), text(tds[1]), text(tds[4])]);
+            }
+        }
+
+        // USN the page is actually for, so a fetched response can be checked against the request
+        const usnMatch = (doc.body ? doc.body.textContent : "").match(/\b1MS\d{2}[A-Z]{2}\d{3}\b/i);
+
+        return {
+            usn: usnMatch ? usnMatch[0].toUpperCase() : "",
+            name: name,
+            header: text(doc.querySelector("div.student-header p")),
+            caption: text(caption),
+            caption_label: caption ? text(caption.querySelector("span.uk-label")) : "",
+            cgpa_texts: cgpaTexts,
+            rows: rows,
+        };
+    },
+
+    // Semester cards are located and clicked in-page: one round-trip per card instead of
+    // a find_elements for the listing plus a find_element chain for each card's button.
+    cards(doc, cardSelectors) {
+        for (const sel of cardSelectors) {
+            const cards = doc.querySelectorAll(sel);
+            if (cards.length) return cards;
+        }
+        return [];
+    },
+
+    // -> "clicked" | "no-button" | "no-card"
+    clickCard(doc, cardSelectors, idx) {
+        const card = msrit.cards(doc, cardSelectors)[idx];
+        if (!card) return "no-card";
+        const btn = card.querySelector("input[value='View Results']")
+            || Array.from(card.querySelectorAll("button")).find((b) => /View Results|VIEW RESULTS/.test(b.textContent))
+            || card.querySelector("a, button, input");
+        if (!btn) return "no-button";
+        btn.click();
+        return "clicked";
+    },
+
+    // Submit the USN form once per USN with fetch() (browser cookies, no navigation), all
+    // requests in flight together; each response is parsed off-screen with DOMParser.
+    // Resolves to null if the form is not on the page, else one {state, view} per USN.
+    // Each response is also recorded in msrit.fetched[usn] as it settles, so a caller whose
+    // execute_async_script timed out can still collect it instead of submitting again.
+    fetched: {},
+
+    fetchUsns(usns, nameSelectors, cgpaXPaths, tbodyCss) {
+        const input = document.getElementById("usn");
+        const form = input && input.form;
+        if (!form) return Promise.resolve(null);
+        msrit.fetched = {};
+        const submitter = form.querySelector("input[type=submit], button[type=submit], button");
+        const method = (form.getAttribute("method") || "GET").toUpperCase();
+
+        const fetchOne = (usn) => {
+            let data;
+            try {
+                data = new FormData(form, submitter);
+            } catch (e) {
+                data = new FormData(form);
+            }
+            data.set(input.name || "usn", usn);
+            let url = form.action || location.href;
+            const init = {method: method, credentials: "same-origin"};
+            if (method === "GET") {
+                const u = new URL(url);
+                for (const [k, v] of data) u.searchParams.set(k, v);
+                url = u.href;
+            } else {
+                init.body = form.enctype === "multipart/form-data" ? data : new URLSearchParams(data);
+            }
+            return fetch(url, init)
+                .then((r) => r.text())
+                .then((html) => {
+                    const doc = new DOMParser().parseFromString(html, "text/html");
+                    const state = msrit.state(doc, tbodyCss);
+                    return {state: state, view: state === "table" ? msrit.extract(doc, nameSelectors, cgpaXPaths, tbodyCss) : null};
+                })
+                .catch(() => ({state: "error", view: null}))
+                .then((res) => {
+                    msrit.fetched[usn] = res;
+                    return res;
+                });
+        };
+
+        return Promise.all(usns.map(fetchOne)).catch(() => null);
+    },
+};
+"""
+
+# Registered with Page.addScriptToEvaluateOnNewDocument; also run directly on a page that
+# was loaded before registration.
+_BUNDLE_JS = "(function () {\n" + _JS_LIB + "\nwindow.__msrit = msrit;\n})();"
+
+
+def _bundle_call(expr):
+    # [result], or null when the bundle is missing from this document
+    return "const msrit = window.__msrit; if (!msrit) return null; return [" + expr + "];"
+
+
+_OOPS_JS = _bundle_call("msrit.oops(document)")
+
+# Page state in one round-trip. arguments: RESULT_TBODY_CSS
+_STATE_JS = _bundle_call("msrit.state(document, arguments[0])")
+
+# Result page in one round-trip. arguments: NAME_SELECTORS, CGPA_XPATHS, RESULT_TBODY_CSS
+_EXTRACT_JS = _bundle_call("msrit.extract(document, arguments[0], arguments[1], arguments[2])")
+
+# arguments: CARD_SELECTORS
+_COUNT_CARDS_JS = _bundle_call("msrit.cards(document, arguments[0]).length")
+
+# arguments: CARD_SELECTORS, card index
+_CLICK_CARD_JS = _bundle_call("msrit.clickCard(document, arguments[0], arguments[1])")
+
+# arguments: usns, NAME_SELECTORS, CGPA_XPATHS, RESULT_TBODY_CSS, callback
+_FETCH_USNS_JS = r"""
+const done = arguments[arguments.length - 1];
+const msrit = window.__msrit;
+if (!msrit) {
+    done(null);
+    return;
+}
+msrit.fetchUsns(arguments[0], arguments[1], arguments[2], arguments[3]).then((res) => done([res]));
+"""
+
+# Responses recorded so far by the last msrit.fetchUsns call: {usn: {state, view}}
+_FETCHED_JS = _bundle_call("msrit.fetched")
+
+
+def install_js_bundle(driver):
+    """Register the msrit helpers for every document this browser loads."""
+    try:
+        driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": _BUNDLE_JS})
+    except Exception:
+        pass
+
+
+def run_js(driver, script, *args, is_async=False):
+    """
+    Run one of the _bundle_call scripts; if the current document has no bundle
+    (loaded before install_js_bundle, or injection skipped), send it once and retry.
+    """
+    execute = driver.execute_async_script if is_async else driver.execute_script
+    res = execute(script, *args)
+    if res is None:
+        driver.execute_script(_BUNDLE_JS)
+        res = execute(script, *args)
+    return res[0] if res else None
+
+
 def page_has_oops(driver):
-    src = driver.page_source.lower()
-    return ("oops!!! your usn could not be found" in src) or \
-           ("could not be found in our result database" in src) or \
-           ("your usn could not be found" in src)
+    return bool(run_js(driver, _OOPS_JS))
+
+
+def page_state(driver):
+    return run_js(driver, _STATE_JS, RESULT_TBODY_CSS) or ""
+
+
+def element_exists(driver, css):
+    """Existence probe: one boolean back instead of serialized WebElement references."""
+    return bool(driver.execute_script("return document.querySelector(arguments[0]) !== null;", css))
+
+
+def usn_entry_present(driver):
+    try:
+        return element_exists(driver, "#usn")
+    except Exception:
+        return False
 
 
 def go_back_to_usn_entry_keep_session(driver):
+    # Form already on this page (e.g. OOPS rendered above it): submit from here, no page load
+    if usn_entry_present(driver):
+        return True
     # Try history back twice
     for _ in range(2):
         try:
@@ -78,7 +395,7 @@ def go_back_to_usn_entry_keep_session(driver):
             wait(driver, 6).until(EC.presence_of_element_located((By.ID, "usn")))
             return True
         except TimeoutException:
-            time.sleep(0.3)
+            continue
     # Try 'click here' / 'try again'
     try:
         link = driver.find_element(
@@ -99,14 +416,20 @@ def go_back_to_usn_entry_keep_session(driver):
         return False
 
 
+def wait_until_stale(driver, element, secs=5):
+    """
+    Wait for a submit to replace the document `element` belongs to.
+    Returns True once it has been replaced, False if it is still the same page after `secs`.
+    """
+    try:
+        wait(driver, secs).until(EC.staleness_of(element))
+        return True
+    except TimeoutException:
+        return False
+
+
 def click_go_button(driver):
-    selectors = [
-        (By.XPATH, "//input[@value='GO' or @value='Go' or @value='go']"),
-        (By.XPATH, "//input[@type='submit']"),
-        (By.XPATH, "//button[contains(., 'GO') or contains(., 'Go') or contains(., 'Submit')]"),
-        (By.ID, "btn7"),
-    ]
-    for by, sel in selectors:
+    for by, sel in GO_BUTTON_SELECTORS:
         try:
             el = driver.find_element(by, sel)
             driver.execute_script("arguments[0].click();", el)
@@ -130,126 +453,97 @@ def wait_for_either(driver, timeout=12):
       - Direct result header/table presence
     Returns a string indicator: "oops" | "cards" | "table" | "timeout"
     """
-    end = time.time() + timeout
-    while time.time() < end:
-        # check OOPS
-        if page_has_oops(driver):
-            return "oops"
-        # cards?
-        if driver.find_elements(By.CSS_SELECTOR, ".cn-result-card"):
-            return "cards"
-        # header/table?
-        if driver.find_elements(By.CSS_SELECTOR, "div.student-header p") or \
-           driver.find_elements(By.CSS_SELECTOR, "table.uk-table.uk-table-striped.res-table tbody"):
-            return "table"
-        time.sleep(0.20)
-    return "timeout"
-
-
-def get_semester_cards(driver):
-    els = driver.find_elements(By.CSS_SELECTOR, ".uk-card.uk-card-default.uk-card-body.cn-card")
-    if els:
-        return els
-    return driver.find_elements(By.CSS_SELECTOR, ".cn-result-card")
-
-
-def extract_student_name(driver):
-    try_selectors = [
-        (By.CSS_SELECTOR, "div.stu-data h3"),
-        (By.CSS_SELECTOR, "div.stu-data h2"),
-        (By.CSS_SELECTOR, "div.stu-data.stu-data2 h2"),
-        (By.CSS_SELECTOR, "div.student-header h2"),
-        (By.CSS_SELECTOR, "div.student-header h3"),
-        (By.XPATH, "//h3[normalize-space() and string-length(normalize-space())>2]"),
-    ]
-    for by, sel in try_selectors:
-        try:
-            els = driver.find_elements(by, sel)
-            for e in els:
-                t = e.text.strip()
-                if t and t.lower() not in ("semester", "result", "exam"):
-                    return t
-        except Exception:
-            continue
-    return "Name Not Found"
+    try:
+        return wait(driver, timeout).until(page_state)
+    except TimeoutException:
+        return "timeout"
 
 
-def extract_semester_number_from_header(driver):
+def count_semester_cards(driver):
+    return run_js(driver, _COUNT_CARDS_JS, CARD_SELECTORS) or 0
+
+
+def click_semester_card(driver, idx):
+    return run_js(driver, _CLICK_CARD_JS, CARD_SELECTORS, idx)
+
+
+def extract_result_view(driver):
+    """
+    Scrape the current page with a single _EXTRACT_JS call.
+    Returns dict as parse_result_view().
+    """
     try:
-        p = driver.find_element(By.CSS_SELECTOR, "div.student-header p")
-        txt = p.text.strip()
-        m = re.search(r"Semester\s*(\d+)", txt, flags=re.IGNORECASE)
-        if m:
-            return int(m.group(1))
+        data = run_js(driver, _EXTRACT_JS, NAME_SELECTORS, CGPA_XPATHS, RESULT_TBODY_CSS) or {}
     except Exception:
-        pass
-    return None
+        data = {}
+    return parse_result_view(data)
 
 
-def extract_sgpa_from_caption(driver):
-    try:
-        cap = driver.find_element(By.CSS_SELECTOR, "table.uk-table.uk-table-striped.res-table caption")
-        txt = cap.text.strip()
-        m = re.search(r"SGPA[:\s]*([\d.]+)", txt)
-        if m:
-            return float(m.group(1))
+def parse_result_view(data):
+    """
+    Parse the raw strings returned by msrit.extract().
+    Returns dict: {"usn": str, "name": str, "semester": int|None, "sgpa": float|None,
+                   "cgpa": float|None, "courses": [ {...}, ... ]}
+    """
+    sem_num = None
+    m = _SEM_RE.search(data.get("header") or "")
+    if m:
+        sem_num = int(m.group(1))
+
+    sgpa = None
+    m = _SGPA_RE.search(data.get("caption") or "")
+    if not m:
+        m = _NUM_RE.search(data.get("caption_label") or "")
+    if m:
         try:
-            span = cap.find_element(By.CSS_SELECTOR, "span.uk-label")
-            mm = re.search(r"([\d.]+)", span.text)
-            if mm:
-                return float(mm.group(1))
-        except Exception:
+            sgpa = float(m.group(1))
+        except ValueError:
             pass
-    except Exception:
-        pass
-    return None
 
-
-def extract_cgpa_if_any(driver):
-    xps = [
-        "//p[contains(., 'CGPA')]",
-        "//div[contains(., 'CGPA')]",
-        "//td[contains(., 'CGPA')]/following-sibling::td[1]",
-    ]
-    for xp in xps:
+    cgpa = None
+    for txt in data.get("cgpa_texts") or []:
+        if not txt:
+            continue
         try:
-            el = driver.find_element(By.XPATH, xp)
-            m = re.search(r"CGPA[:\s]*([\d.]+)", el.text)
+            m = _CGPA_RE.search(txt)
             if m:
-                return float(m.group(1))
-            mm = re.search(r"([\d.]+)", el.text)
+                cgpa = float(m.group(1))
+                break
+            mm = _NUM_RE.search(txt)
             if mm:
                 val = float(mm.group(1))
                 if 0 <= val <= 10:
-                    return val
-        except Exception:
+                    cgpa = val
+                    break
+        except ValueError:
             continue
-    return None
+
+    ts = datetime.now().strftime("%H:%M:%S")
+    courses = [
+        {"Course_Code": code, "Course_Name": cname, "Grade": grade, "Timestamp": ts}
+        for code, cname, grade in data.get("rows") or []
+        if code and cname
+    ]
+
+    return {
+        "usn": (data.get("usn") or "").upper(),
+        "name": data.get("name") or "Name Not Found",
+        "semester": sem_num,
+        "sgpa": sgpa,
+        "cgpa": cgpa,
+        "courses": courses,
+    }
 
 
-def extract_courses_from_visible_table(driver):
-    courses = []
+def extract_result_table(driver):
+    """Wait for the results table to render, then extract_result_view()."""
     try:
-        tbody = wait(driver, 10).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "table.uk-table.uk-table-striped.res-table tbody"))
+        wait(driver, 10).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, RESULT_TBODY_CSS))
         )
-        rows = tbody.find_elements(By.TAG_NAME, "tr")
-        for r in rows:
-            tds = r.find_elements(By.TAG_NAME, "td")
-            if len(tds) >= 5:
-                code = tds[0].text.strip()
-                name = tds[1].text.strip()
-                grade = tds[4].text.strip()
-                if code and name:
-                    courses.append({
-                        "Course_Code": code,
-                        "Course_Name": name,
-                        "Grade": grade,
-                        "Timestamp": datetime.now().strftime("%H:%M:%S"),
-                    })
-    except Exception:
+    except TimeoutException:
         pass
-    return courses
+    return extract_result_view(driver)
 # ---------------------------------------------
 
 
@@ -263,36 +557,23 @@ def scrape_current_usn_view_structured(driver, usn):
     if page_has_oops(driver):
         return (False, None, None, [])
 
-    name = extract_student_name(driver)
+    landing = extract_result_view(driver)
+    name = landing["name"]
     semesters = []
     cgpa_final = None
 
     # Try semester cards flow
-    cards = get_semester_cards(driver)
-    if cards:
-        for idx in range(len(cards)):
-            cards = get_semester_cards(driver)
-            if idx >= len(cards):
-                break
-            card = cards[idx]
-
-            # Find view button inside card
-            view_btn = None
+    n_cards = count_semester_cards(driver)
+    if n_cards:
+        for idx in range(n_cards):
+            # Find and click the view button inside the card
             try:
-                view_btn = card.find_element(By.CSS_SELECTOR, "input[value='View Results']")
+                clicked = click_semester_card(driver, idx)
             except Exception:
-                try:
-                    view_btn = card.find_element(By.XPATH, ".//button[contains(., 'View Results') or contains(., 'VIEW RESULTS')]")
-                except Exception:
-                    cands = card.find_elements(By.XPATH, ".//a|.//button|.//input")
-                    view_btn = cands[0] if cands else None
-
-            if not view_btn:
                 continue
-
-            try:
-                driver.execute_script("arguments[0].click();", view_btn)
-            except Exception:
+            if clicked == "no-card":
+                break
+            if clicked != "clicked":
                 continue
 
             # Wait for result page
@@ -302,25 +583,21 @@ def scrape_current_usn_view_structured(driver, usn):
                 go_back_to_usn_entry_keep_session(driver)
                 continue
 
-            sem_num = extract_semester_number_from_header(driver)
-            sgpa = extract_sgpa_from_caption(driver)
-            cgpa = extract_cgpa_if_any(driver)
-            if cgpa is not None:
-                cgpa_final = cgpa
+            view = extract_result_table(driver)
+            if view["cgpa"] is not None:
+                cgpa_final = view["cgpa"]
 
-            courses = extract_courses_from_visible_table(driver)
-            if courses:
+            if view["courses"]:
                 semesters.append({
-                    "Semester": sem_num,
-                    "SGPA": sgpa,
-                    "Courses": courses
+                    "Semester": view["semester"],
+                    "SGPA": view["sgpa"],
+                    "Courses": view["courses"]
                 })
 
             # Back to cards view
             try:
                 driver.back()
                 wait(driver, 8).until(EC.presence_of_element_located((By.CSS_SELECTOR, ".cn-result-card")))
-                time.sleep(0.15)
             except Exception:
                 # try to recover to USN input; break out to avoid loop
                 go_back_to_usn_entry_keep_session(driver)
@@ -331,20 +608,16 @@ def scrape_current_usn_view_structured(driver, usn):
         return (len(semesters) > 0, name, cgpa_final, semesters)
 
     # Direct results (no cards)
-    indicator_present = driver.find_elements(By.CSS_SELECTOR, "div.student-header p") or \
-                        driver.find_elements(By.CSS_SELECTOR, "table.uk-table.uk-table-striped.res-table tbody")
+    indicator_present = element_exists(driver, f"div.student-header p, {RESULT_TBODY_CSS}")
     if indicator_present:
-        sem_num = extract_semester_number_from_header(driver)
-        sgpa = extract_sgpa_from_caption(driver)
-        cgpa = extract_cgpa_if_any(driver)
-        if cgpa is not None:
-            cgpa_final = cgpa
-        courses = extract_courses_from_visible_table(driver)
-        if courses:
+        view = landing if landing["courses"] else extract_result_table(driver)
+        if view["cgpa"] is not None:
+            cgpa_final = view["cgpa"]
+        if view["courses"]:
             semesters.append({
-                "Semester": sem_num,
-                "SGPA": sgpa,
-                "Courses": courses
+                "Semester": view["semester"],
+                "SGPA": view["sgpa"],
+                "Courses": view["courses"]
             })
         go_back_to_usn_entry_keep_session(driver)
         return (len(semesters) > 0, name, cgpa_final, semesters)
@@ -371,25 +644,27 @@ def submit_and_collect_usn(driver, usn):
     except Exception:
         return (False, None, None, [])
     set_input_value_js(driver, u, usn)
-    time.sleep(0.15)
 
     # Click GO
     if not click_go_button(driver):
-        print("Could not click GO programmatically. Please click GO manually on the page, then press ENTER here.")
-        input("Press ENTER after clicking GO...")
-    time.sleep(0.5)
+        prompt_user("Press ENTER after clicking GO...",
+                    f"Could not click GO programmatically for {usn}. Please click GO manually on the page, then press ENTER here.")
+    # The form may have been submitted from a page still showing the previous OOPS or
+    # result; its state must never be read as this USN's, so only a replaced document counts
+    replaced = wait_until_stale(driver, u)
 
     # If captcha visible again, ask to solve
     try:
-        if driver.find_elements(By.ID, "captcha"):
-            print("[!] Captcha appears again. Please solve it on the site for this USN, click GO, then press ENTER.")
-            input("Press ENTER after solving captcha & clicking GO...")
+        if element_exists(driver, "#captcha"):
+            prompt_user("Press ENTER after solving captcha & clicking GO...",
+                        f"[!] Captcha appears again. Please solve it on the site for {usn}, click GO, then press ENTER.")
+            replaced = replaced or wait_until_stale(driver, u)
     except Exception:
         pass
 
-    # Retry loop for ambiguous/timeouts
+    # Retry loop for ambiguous/timeouts (a submit whose page never got replaced is a timeout)
     for attempt in range(RETRY_ON_TIMEOUT + 1):
-        ind = wait_for_either(driver, timeout=12)
+        ind = wait_for_either(driver, timeout=12) if replaced else "timeout"
         if ind == "oops":
             # explicit OOPS page
             return (False, None, None, [])
@@ -400,29 +675,33 @@ def submit_and_collect_usn(driver, usn):
             # timeout / ambiguous
             if attempt < RETRY_ON_TIMEOUT:
                 print(f"[WARN] Ambiguous / timeout for {usn} (attempt {attempt+1}/{RETRY_ON_TIMEOUT}). Retrying submit...")
-                # Re-submit (refill + click)
+                # Re-submit (refill + click) from whatever form is on the page now
                 try:
+                    u = driver.find_element(By.ID, "usn")
                     set_input_value_js(driver, u, usn)
                     click_go_button(driver)
-                    time.sleep(0.8)
+                    replaced = wait_until_stale(driver, u)
                 except Exception:
-                    time.sleep(0.8)
+                    # No form to refill: the submitted page has already been replaced
+                    replaced = not usn_entry_present(driver)
                 # also check if captcha reappeared
                 try:
-                    if driver.find_elements(By.ID, "captcha"):
-                        print("[!] Captcha reappeared while retrying. Please solve it & click GO, then press ENTER.")
-                        input("Press ENTER after solving captcha & clicking GO...")
+                    if element_exists(driver, "#captcha"):
+                        prompt_user("Press ENTER after solving captcha & clicking GO...",
+                                    f"[!] Captcha reappeared while retrying {usn}. Please solve it & click GO, then press ENTER.")
+                        replaced = replaced or wait_until_stale(driver, u)
                 except Exception:
                     pass
                 continue
             else:
                 # exhausted automatic retries -> ask user to solve captcha and continue
-                print(f"[INFO] Automatic retries exhausted for {usn}. This is NOT counted as OOPS yet.")
-                print("[ACTION] Please check the browser, solve the CAPTCHA if visible, click GO on the page, then press ENTER here to continue.")
-                input("Press ENTER after solving captcha & clicking GO (or press ENTER to skip)...")
+                prompt_user("Press ENTER after solving captcha & clicking GO (or press ENTER to skip)...",
+                            f"[INFO] Automatic retries exhausted for {usn}. This is NOT counted as OOPS yet.\n"
+                            "[ACTION] Please check the browser, solve the CAPTCHA if visible, click GO on the page, then press ENTER here to continue.")
 
-                # Give user a longer wait for the page to settle
-                ind2 = wait_for_either(driver, timeout=30)
+                # Give user a longer wait for the page to settle (only once it is a new page)
+                replaced = replaced or wait_until_stale(driver, u, secs=30)
+                ind2 = wait_for_either(driver, timeout=30) if replaced else "timeout"
                 if ind2 in ("cards", "table"):
                     return scrape_current_usn_view_structured(driver, usn)
                 elif ind2 == "oops":
@@ -436,6 +715,66 @@ def submit_and_collect_usn(driver, usn):
     return (False, None, None, [])
 
 
+# ---------- Pipelined submits (in-page fetch, no navigation) ----------
+def collect_fetched(driver, usns, secs=30):
+    """
+    Responses of an already-sent fetch batch (e.g. after a script timeout), read from
+    msrit.fetched; waits up to `secs` for requests still in flight. Missing ones are None.
+    """
+    def settled(d):
+        got = run_js(d, _FETCHED_JS) or {}
+        return got if all(u in got for u in usns) else False
+
+    try:
+        got = wait(driver, secs).until(settled)
+    except TimeoutException:
+        try:
+            got = run_js(driver, _FETCHED_JS) or {}
+        except Exception:
+            got = {}
+    except Exception:
+        got = {}
+    return [got.get(u) for u in usns]
+
+
+def fetch_usns_via_http(driver, usns):
+    """
+    POST the USN form for every USN in `usns` from inside the page (session cookies, CAPTCHA
+    already solved), all requests in flight at once, without navigating the browser.
+    Returns (results, complete):
+      results  -> dict[USN] -> same tuple as scrape_current_usn_view_structured(), only for
+                  conclusive responses (OOPS, or a direct result table with courses that shows
+                  the requested USN). Anything else (semester cards, another student's page,
+                  CAPTCHA, errors) is left out so the caller falls back to submit_and_collect_usn().
+                  An OOPS page does not show the USN, so a fetched OOPS is only a hint; the
+                  caller confirms through the browser any OOPS it would stop the track on.
+      complete -> True only if every USN was conclusive; callers stop prefetching otherwise,
+                  since those USNs have to be submitted through Selenium as well.
+    """
+    if not usns or not usn_entry_present(driver):
+        return {}, False
+    try:
+        responses = run_js(
+            driver, _FETCH_USNS_JS, list(usns), NAME_SELECTORS, CGPA_XPATHS, RESULT_TBODY_CSS, is_async=True
+        )
+    except Exception:
+        # The requests have already gone out; collect their answers rather than resubmitting
+        responses = collect_fetched(driver, usns)
+
+    results = {}
+    for usn, resp in zip(usns, responses or []):
+        state = (resp or {}).get("state")
+        if state == "oops":
+            results[usn] = (False, None, None, [])
+        elif state == "table":
+            view = parse_result_view(resp.get("view") or {})
+            # Concurrent POSTs share one session; never file a page under a USN it does not show
+            if view["courses"] and view["usn"] == usn.upper():
+                semesters = [{"Semester": view["semester"], "SGPA": view["sgpa"], "Courses": view["courses"]}]
+                results[usn] = (True, view["name"], view["cgpa"], semesters)
+    return results, len(results) == len(usns)
+
+
 # ---------- Student container helpers ----------
 def ensure_student(record_map, usn, name=None, cgpa=None):
     """
@@ -457,178 +796,369 @@ def ensure_student(record_map, usn, name=None, cgpa=None):
     return record_map[usn]
 
 
+def _course_key(c):
+    return (c.get("Course_Code"), c.get("Grade"), c.get("Course_Name"))
+
+
 def merge_semesters(student_obj, new_semesters):
     """
     Merge semesters by 'Semester' number; append non-duplicates.
+    The semester index ("_sem_index") and each semester's course keys ("_course_keys")
+    are kept on the objects and updated in place, so a merge costs O(new courses);
+    export_student() strips them.
     """
-    idx_by_sem = {s.get("Semester"): i for i, s in enumerate(student_obj["Semesters"])}
+    if "_sem_index" not in student_obj:
+        student_obj["_sem_index"] = {s.get("Semester"): i for i, s in enumerate(student_obj["Semesters"])}
+    idx_by_sem = student_obj["_sem_index"]
     for sem in new_semesters:
         s_no = sem.get("Semester")
         if s_no in idx_by_sem:
             dest = student_obj["Semesters"][idx_by_sem[s_no]]
             if dest.get("SGPA") is None and sem.get("SGPA") is not None:
                 dest["SGPA"] = sem["SGPA"]
-            existing = {(c.get("Course_Code"), c.get("Grade"), c.get("Course_Name")) for c in dest.get("Courses", [])}
+            if "_course_keys" not in dest:
+                dest["_course_keys"] = {_course_key(c) for c in dest.get("Courses", [])}
+            existing = dest["_course_keys"]
             for c in sem.get("Courses", []):
-                key = (c.get("Course_Code"), c.get("Grade"), c.get("Course_Name"))
+                key = _course_key(c)
                 if key not in existing:
+                    existing.add(key)
                     dest.setdefault("Courses", []).append(c)
         else:
+            if "_course_keys" not in sem:
+                sem["_course_keys"] = {_course_key(c) for c in sem.get("Courses", [])}
+            idx_by_sem[s_no] = len(student_obj["Semesters"])
             student_obj["Semesters"].append(sem)
 
 
-# ---------- Main ----------
-def main():
-    start_ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    print(f"=== MSRIT Selenium Scraper (Start: {start_ts}) ===\n")
-    print("=== MSRIT Selenium Scraper (Years 21–24, Branches AD/AI/CS/IS/CI/CY | Single students array) ===\n")
-    outfile = input(f"Output JSON filename (default {OUTFILE_DEFAULT}): ").strip() or OUTFILE_DEFAULT
+def export_student(student_obj):
+    """Copy of a student object without the private merge bookkeeping (keys starting with '_')."""
+    out = {k: v for k, v in student_obj.items() if not k.startswith("_")}
+    out["Semesters"] = [
+        {k: v for k, v in sem.items() if not k.startswith("_")}
+        for sem in student_obj.get("Semesters", [])
+    ]
+    return out
+
+
+# ---------- Output (NDJSON while scraping, one JSON document at the end) ----------
+def _dumps_line(obj):
+    """One NDJSON line as UTF-8 bytes."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(obj, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def stream_path_for(outfile):
+    """NDJSON stream next to `outfile`; never the output itself, even if it ends in .ndjson."""
+    return outfile + ".ndjson"
+
+
+def open_student_stream(stream_path):
+    """Start a fresh stream for this run; every run re-scrapes from the first roll."""
+    return open(stream_path, "wb", buffering=STREAM_BUFFER_SIZE)
+
+
+def write_student(stream, student_obj):
+    """Append one finished student as an NDJSON line; flushed every STREAM_FLUSH_EVERY students."""
+    global _stream_unflushed
+    line = _dumps_line(export_student(student_obj))
+    with _stream_lock:
+        if stream.closed:
+            # shutting down: main() has already closed the stream and is saving results
+            return
+        stream.write(line)
+        _stream_unflushed += 1
+        if _stream_unflushed >= STREAM_FLUSH_EVERY:
+            stream.flush()
+            _stream_unflushed = 0
+
+
+def save_payload(outfile, payload):
+    """Write the final indented JSON; orjson (UTF-8, binary) when installed, else stdlib json."""
+    if orjson is not None:
+        with open(outfile, "wb") as f:
+            f.write(orjson.dumps(payload, option=orjson.OPT_INDENT_2))
+    else:
+        with open(outfile, "w", encoding="utf-8") as f:
+            json.dump(payload, f, indent=2, ensure_ascii=False)
+
 
-    # Launch browser
+def load_students(stream_path):
+    """
+    Read an NDJSON stream back into dict[USN] -> student_object, merging repeated USNs.
+    A truncated last line from a crash is skipped.
+    """
+    students_map = {}
+    if not os.path.exists(stream_path):
+        return students_map
+    with open(stream_path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                stu = json.loads(line)
+            except ValueError:
+                continue
+            dest = ensure_student(students_map, stu["USN"], stu.get("Name"), stu.get("CGPA"))
+            merge_semesters(dest, stu.get("Semesters", []))
+    return students_map
+
+
+# ---------- Workers (one Chrome session per thread) ----------
+def tune_webdriver_http_pool():
+    """
+    Make every RemoteConnection's urllib3 pool keep its socket to chromedriver alive
+    (TCP_NODELAY + SO_KEEPALIVE), so a worker's WebDriver commands, which are always issued
+    one at a time, reuse one connection instead of handshaking (and leaving TIME_WAIT
+    sockets) per call.
+    """
+    original = RemoteConnection._get_connection_manager
+    if getattr(original, "_tuned", False):
+        return
+
+    def _get_connection_manager(self):
+        manager = original(self)
+        manager.connection_pool_kw.update(
+            maxsize=WEBDRIVER_POOL_MAXSIZE,
+            socket_options=HTTPConnection.default_socket_options + [
+                (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+            ],
+        )
+        return manager
+
+    _get_connection_manager._tuned = True
+    RemoteConnection._get_connection_manager = _get_connection_manager
+
+
+def launch_driver():
     options = webdriver.ChromeOptions()
     options.add_argument("--no-sandbox")
     options.add_argument("--disable-dev-shm-usage")
-    driver = webdriver.Chrome(options=options)
-    driver.maximize_window()
+    options.add_argument("--disable-extensions")
+    options.add_argument("--disable-background-networking")
+    # Return from navigations at DOMContentLoaded; wait_for_either() decides when the page is usable
+    options.page_load_strategy = "eager"
+    driver = webdriver.Chrome(options=options, keep_alive=True)
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+    except Exception:
+        pass
+    install_js_bundle(driver)
     driver.get(BASE_URL)
+    return driver
+
+
+def get_worker_driver():
+    """
+    Returns (driver, fresh) for the calling worker thread.
+    The browser is created on first use and reused for every later track of that thread;
+    fresh=True means the CAPTCHA has not been solved in it yet.
+    """
+    driver = getattr(_worker, "driver", None)
+    if driver is not None:
+        return driver, False
+    driver = launch_driver()
+    with _drivers_lock:
+        # main() may have run quit_all_drivers() while this browser was starting
+        stopping = _stop.is_set()
+        if not stopping:
+            _drivers.append(driver)
+    if stopping:
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        raise RuntimeError("scraper is shutting down")
+    _worker.driver = driver
+    return driver, True
 
-    # Single container for all students (normal + diploma combined)
-    students_map = {}
 
+def quit_all_drivers():
+    with _drivers_lock:
+        drivers = list(_drivers)
+        _drivers.clear()
+    for driver in drivers:
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+
+def submit_first_usn_manually(driver, usn):
+    """
+    Prefill `usn` so the user can solve the CAPTCHA and click GO in a fresh browser.
+    Returns same tuple as scrape_current_usn_view_structured().
+    """
     try:
-        # Build plan: for each branch, iterate years 21->24
-        plan = [(y, b) for b in BRANCHES for y in YEARS]
+        usn_input = wait(driver, 12).until(EC.presence_of_element_located((By.ID, "usn")))
+        set_input_value_js(driver, usn_input, usn)
+        prompt_user("After you click GO on the site, press ENTER here to begin automation...",
+                    f"[ACTION] Prefilled USN {usn} in a new browser window.\n"
+                    "Please solve the CAPTCHA on the site and CLICK GO manually for this USN.")
+    except Exception:
+        prompt_user("Solve captcha on the page and click GO, then press ENTER here...",
+                    f"Could not prefill {usn} automatically. Make sure the page is loaded.")
+
+    print(f"\n=== Processing first (manual) {usn} ===")
+    ind = wait_for_either(driver, timeout=12)
+    if ind in ("cards", "table"):
+        return scrape_current_usn_view_structured(driver, usn)
+    if ind == "oops":
+        print(f"{usn} -> OOPS on first submit (manual). Proceeding.")
+    else:
+        print(f"{usn} -> Timeout after manual submit. Proceeding.")
+    go_back_to_usn_entry_keep_session(driver)
+    return (False, None, None, [])
 
-        first_year, first_branch = plan[0]
-        first_usn = f"1MS{first_year}{first_branch}{ROLL_START:03d}"
 
-        # Prefill first USN so user can solve CAPTCHA and click GO manually
+def lookahead_size(consec_oops):
+    """
+    How many USNs to submit in the next pipelined batch (0 -> submit the next one via Selenium).
+    Once an OOPS run has started, only the rolls before the one that would end the track are
+    fetched; that final roll is always submitted through the browser, so the stop decision
+    never rests on concurrent fetches alone. A full HTTP_BATCH fetched before the run started
+    can still reach past the stop; scrape_track() confirms such a final OOPS in the browser.
+    """
+    if consec_oops <= 0:
+        return HTTP_BATCH
+    return max(0, min(HTTP_BATCH, MAX_CONSEC_OOPS - 1 - consec_oops))
+
+
+def track_usns(year, branch, first_roll, last_roll):
+    """Every USN of a track, formatted once up front: 1MS{year}{branch}{first_roll..last_roll}."""
+    prefix = f"1MS{year}{branch}"
+    return [f"{prefix}{roll:03d}" for roll in range(first_roll, last_roll + 1)]
+
+
+def scrape_track(year, branch, track, stream):
+    """
+    Scrape one track in the calling worker's browser:
+      track "normal"  -> 1MS{year}{branch}{ROLL_START..DIP_START-1}
+      track "diploma" -> 1MS{year+1}{branch}{DIP_START..ROLL_MAX}
+    Stops after MAX_CONSEC_OOPS continuous OOPS.
+    Each student is written to `stream` as soon as it is scraped; returns the number written.
+    """
+    if track == "diploma":
         try:
-            usn_input = wait(driver, 12).until(EC.presence_of_element_located((By.ID, "usn")))
-            set_input_value_js(driver, usn_input, first_usn)
-            print(f"[ACTION] Prefilled first USN: {first_usn}")
-            print("Please solve the CAPTCHA on the site and CLICK GO manually for this first USN.")
-            input("After you click GO on the site, press ENTER here to begin automation...")
+            year_int = int(year)
         except Exception:
-            print("Could not prefill USN automatically. Make sure the page is loaded.")
-            input("Solve captcha on the page and click GO for the first USN, then press ENTER here...")
+            year_int = 0
+        year = f"{year_int + 1:02d}"
+        usns = track_usns(year, branch, DIP_START, ROLL_MAX)
+        label = " [Diploma]"
+    else:
+        usns = track_usns(year, branch, ROLL_START, DIP_START - 1)
+        label = ""
+
+    written = 0
+    driver, fresh = get_worker_driver()
+    print(f"\n=== YEAR {year} | BRANCH {branch} ({track.upper()}) ===")
+    consec_oops = 0
+    prefetched = {}
+    fetched_upto = 0  # usns[:fetched_upto] have already been offered to fetch_usns_via_http()
+    # Cleared once a batch comes back with responses Selenium has to redo (semester cards,
+    # errors): from then on only the OOPS tail is fetched, so a USN is POSTed a second time
+    # only when its fetch was inconclusive, not for every student of the track.
+    prefetch = True
+    for i, usn in enumerate(usns):
+        if _stop.is_set():
+            break
+        print(f"--- Processing {usn}{label} ---")
+        try:
+            if fresh:
+                fresh = False
+                found, name, cgpa, semesters = submit_first_usn_manually(driver, usn)
+            else:
+                batch = lookahead_size(consec_oops)
+                if i >= fetched_upto and batch and (prefetch or consec_oops > 0):
+                    fetched_upto = i + batch
+                    prefetched, complete = fetch_usns_via_http(driver, usns[i:fetched_upto])
+                    if not complete:
+                        prefetch = False
+                if usn in prefetched:
+                    found, name, cgpa, semesters = prefetched.pop(usn)
+                    if not found and consec_oops + 1 >= MAX_CONSEC_OOPS:
+                        # Never end a track on a fetched OOPS alone
+                        found, name, cgpa, semesters = submit_and_collect_usn(driver, usn)
+                else:
+                    found, name, cgpa, semesters = submit_and_collect_usn(driver, usn)
+        except Exception as e:
+            print(f"Error while processing{label} {usn}: {e}")
+            try:
+                go_back_to_usn_entry_keep_session(driver)
+            except Exception:
+                pass
+            continue
 
-        # Handle first manual submit
-        print(f"\n=== Processing first (manual) {first_usn} ===")
-        ind = wait_for_either(driver, timeout=12)
-        if ind == "oops":
-            print(f"{first_usn} -> OOPS on first submit (manual). Proceeding.")
+        if not found:
+            consec_oops += 1
+            print(f"{usn} -> OOPS or no data ({consec_oops}/{MAX_CONSEC_OOPS}){label}")
             go_back_to_usn_entry_keep_session(driver)
-        elif ind in ("cards", "table"):
-            found, name, cgpa, semesters = scrape_current_usn_view_structured(driver, first_usn)
-            if found:
-                stu = ensure_student(students_map, first_usn, name, cgpa)
-                merge_semesters(stu, semesters)
-                print(f"Completed {first_usn}.")
-            else:
-                print(f"{first_usn} -> No data scraped.")
+            if consec_oops >= MAX_CONSEC_OOPS:
+                print(f"[STOP] {MAX_CONSEC_OOPS} continuous OOPS for {year}{branch} ({track}).")
+                break
         else:
-            print(f"{first_usn} -> Timeout after manual submit. Proceeding.")
-            go_back_to_usn_entry_keep_session(driver)
-
-        # Iterate plan
-        for (year, branch) in plan:
-            print(f"\n=== YEAR {year} | BRANCH {branch} (NORMAL) ===")
             consec_oops = 0
-            roll = ROLL_START
-            # Continue until MAX_CONSEC_OOPS reached
-            while True:
-                usn = f"1MS{year}{branch}{roll:03d}"
-                print(f"--- Processing {usn} ---")
-                try:
-                    found, name, cgpa, semesters = submit_and_collect_usn(driver, usn)
-                except Exception as e:
-                    print(f"Error while processing {usn}: {e}")
-                    try:
-                        go_back_to_usn_entry_keep_session(driver)
-                    except Exception:
-                        pass
-                    roll += 1
-                    continue
-
-                if not found:
-                    consec_oops += 1
-                    print(f"{usn} -> OOPS or no data ({consec_oops}/{MAX_CONSEC_OOPS})")
-                    if consec_oops >= MAX_CONSEC_OOPS:
-                        print(f"[STOP] {MAX_CONSEC_OOPS} continuous OOPS for {year}{branch} (normal).")
-                        go_back_to_usn_entry_keep_session(driver)
-                        break
-                    go_back_to_usn_entry_keep_session(driver)
-                else:
-                    consec_oops = 0
-                    stu = ensure_student(students_map, usn, name, cgpa)
-                    merge_semesters(stu, semesters)
-                    time.sleep(0.12)
-                roll += 1
+            stu = ensure_student({}, usn, name, cgpa)
+            merge_semesters(stu, semesters)
+            write_student(stream, stu)
+            written += 1
+    return written
+
+
+# ---------- Main ----------
+def main():
+    start_ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    print(f"=== MSRIT Selenium Scraper (Start: {start_ts}) ===\n")
+    print("=== MSRIT Selenium Scraper (Years 21–24, Branches AD/AI/CS/IS/CI/CY | Single students array) ===\n")
+    outfile = input(f"Output JSON filename (default {OUTFILE_DEFAULT}): ").strip() or OUTFILE_DEFAULT
 
-            # Diploma track for same branch, year+1 but store into the same students_map
+    # Students are streamed to NDJSON as they complete; the single JSON is built at the end
+    stream_path = stream_path_for(outfile)
+    stream = open_student_stream(stream_path)
+
+    # Build plan: for each branch, iterate years 21->24; each (year, branch) has a normal and a diploma track
+    plan = [(y, b) for b in BRANCHES for y in YEARS]
+    jobs = [(y, b, track) for (y, b) in plan for track in ("normal", "diploma")]
+
+    tune_webdriver_http_pool()
+    pool = ThreadPoolExecutor(max_workers=MAX_WORKERS)
+    try:
+        futures = [(job, pool.submit(scrape_track, *job, stream)) for job in jobs]
+        serve_prompts(futures)
+        for (year, branch, track), fut in futures:
             try:
-                year_int = int(year)
-            except Exception:
-                year_int = 0
-            dip_year = f"{year_int + 1:02d}"
-
-            print(f"\n=== YEAR {dip_year} | BRANCH {branch} (DIPLOMA) ===")
-            consec_oops_dip = 0
-            roll = DIP_START
-            while True:
-                usn = f"1MS{dip_year}{branch}{roll:03d}"
-                print(f"--- Processing {usn} (Diploma) ---")
-                try:
-                    found, name, cgpa, semesters = submit_and_collect_usn(driver, usn)
-                except Exception as e:
-                    print(f"Error while processing (Diploma) {usn}: {e}")
-                    try:
-                        go_back_to_usn_entry_keep_session(driver)
-                    except Exception:
-                        pass
-                    roll += 1
-                    continue
-
-                if not found:
-                    consec_oops_dip += 1
-                    print(f"{usn} -> OOPS or no data ({consec_oops_dip}/{MAX_CONSEC_OOPS}) [Diploma]")
-                    if consec_oops_dip >= MAX_CONSEC_OOPS:
-                        print(f"[STOP] {MAX_CONSEC_OOPS} continuous OOPS for {dip_year}{branch} (diploma).")
-                        go_back_to_usn_entry_keep_session(driver)
-                        break
-                    go_back_to_usn_entry_keep_session(driver)
-                else:
-                    consec_oops_dip = 0
-                    stu = ensure_student(students_map, usn, name, cgpa)
-                    merge_semesters(stu, semesters)
-                    time.sleep(0.12)
-                roll += 1
+                fut.result()
+            except Exception as e:
+                print(f"Track {year}{branch} ({track}) failed: {e}")
 
         print("\nAll year/branch iterations completed.")
 
     finally:
+        _stop.set()
+        pool.shutdown(wait=False, cancel_futures=True)
+        with _stream_lock:
+            stream.close()
+
         # Save results
         try:
+            students_map = load_students(stream_path)
             payload = {
                 "start_time": start_ts,
-                "students": list(students_map.values())
+                "students": [export_student(stu) for stu in students_map.values()]
             }
-            with open(outfile, "w", encoding="utf-8") as f:
-                json.dump(payload, f, indent=2, ensure_ascii=False)
-            print(f"\nSaved results to {outfile}: {len(payload['students'])} students.")
+            save_payload(outfile, payload)
+            print(f"\nSaved results to {outfile}: {len(payload['students'])} students (stream: {stream_path}).")
             if payload["students"]:
                 print("Sample student:\n", json.dumps(payload["students"][0], indent=2, ensure_ascii=False))
         except Exception as e:
             print("Failed to save results:", e)
 
-        try:
-            driver.quit()
-        except Exception:
-            pass
+        quit_all_drivers()
 
 
 if __name__ == "__main__":
     main()
-
-